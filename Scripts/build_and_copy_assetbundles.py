@@ -1,28 +1,136 @@
 import argparse
+import asyncio
+import dataclasses
 import subprocess
+import threading
 import shutil
 import os
 import sys
 import logging
 import glob
-from typing import Optional, Tuple, Dict, Any, List
+import filecmp
+import hashlib
+import json
+import struct
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Optional, Tuple, Dict, Any, List, Callable, Set
 
 # --- Constants ---
 UNITY_ENV_VAR = "UNITY_EDITOR_PATH"
+STAGING_DIR_SUFFIX = ".staging"
+BACKUP_DIR_SUFFIX = ".backup"
+TEXTURE_CACHE_DIR = ".texture_cache"
+HISTORY_FILE = ".assetbundle_history.jsonl"
+HISTORY_SIZE_THRESHOLD_PERCENT = 5.0
+HISTORY_TIME_THRESHOLD_PERCENT = 25.0
+# Stage timings below this change are treated as noise
+HISTORY_MIN_TIME_DELTA_SECONDS = 1.0
+
+# --- PNG Optimization ---
+# Bump when the optimizer output changes so cached textures are rebuilt
+PNG_OPTIMIZER_VERSION = 1
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# Ancillary chunks that affect how pixels are displayed; all others are metadata
+PNG_KEPT_ANCILLARY_CHUNKS = {
+    b"tRNS",
+    b"gAMA",
+    b"cHRM",
+    b"sRGB",
+    b"iCCP",
+    b"sBIT",
+    b"cICP",
+}
+PNG_CHANNELS_BY_COLOR_TYPE = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+PNG_DEFLATE_LEVELS = (6, 9)
+PNG_DEFLATE_STRATEGIES = (zlib.Z_DEFAULT_STRATEGY, zlib.Z_FILTERED)
+# Images up to this many pixel bytes get the exhaustive filter/deflate search;
+# larger ones only try the adaptive filter once at the highest level
+PNG_FULL_SEARCH_MAX_BYTES = 256 * 1024
+# Filter heuristic cost of a filtered byte: its magnitude as a signed value
+PNG_FILTER_COST_TABLE = bytes(min(b, 256 - b) for b in range(256))
 
 # --- Logging Setup ---
-# Configure logging to be less verbose by default
-logging.basicConfig(
-    level=logging.INFO,  # Keep INFO level for key messages
-    format="%(message)s",  # Simplified format
-)
+# Handlers are configured in main(); library users keep their own logging setup
 log = logging.getLogger(__name__)
 
+# =============================================================================
+# Library Types
+# =============================================================================
+
+
+class PipelineConfigError(Exception):
+    """Raised when a Pipeline cannot be created from the given configuration."""
+
+
+@dataclass
+class PipelineCallbacks:
+    """
+    Optional progress and event hooks.
+    - on_bytes_copied(byte_count): After each file is copied or staged.
+    - on_item_copied(mapping_type, source_path, target_path): After each mapped item.
+    - on_unity_log(line): For each output line of the Unity build.
+    - on_manual_build(unity_project_path): In manual mode; return False to cancel.
+    - on_stage_finished(stage, seconds): After each completed step ('assets', 'build', 'outputs').
+    """
+
+    on_bytes_copied: Optional[Callable[[int], None]] = None
+    on_item_copied: Optional[Callable[[str, str, str], None]] = None
+    on_unity_log: Optional[Callable[[str], None]] = None
+    on_manual_build: Optional[Callable[[str], bool]] = None
+    on_stage_finished: Optional[Callable[[str, float], None]] = None
+
+
+@dataclass
+class TextureOptions:
+    """
+    Settings for the lossless PNG optimization stage.
+    - cache_dir: Content-addressed cache of optimized PNGs.
+    - budgets: Size budgets in bytes per directory relative to the target mod dir.
+      Checked in the build output step only, since the mod dir is what ships.
+    - workers: Process pool size (at least 1); None uses the CPU count.
+    """
+
+    cache_dir: str
+    budgets: Dict[str, int] = field(default_factory=dict)
+    workers: Optional[int] = None
+
+
+@dataclass
+class BuildResult:
+    """
+    Outcome of a single pipeline run.
+    items_copied counts mapped items with at least one file copied or staged;
+    items skipped by a staged deploy because they are up to date are not included.
+    """
+
+    exit_code: int
+    items_copied: int = 0
+    bytes_copied: int = 0
+    duration_seconds: float = 0.0
+    stage_durations: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def success(self) -> bool:
+        return self.exit_code == 0
+
+
 # =============================================================================
 # Helper Functions
 # =============================================================================
 
 
+def _emit(callbacks: Optional[PipelineCallbacks], hook: str, *args: Any) -> None:
+    """Invokes a callback hook if it is set."""
+    handler = getattr(callbacks, hook, None) if callbacks else None
+    if handler:
+        handler(*args)
+
+
 def _resolve_single_path(
     cli_path: Optional[str],
     env_var_name: Optional[str],
@@ -78,8 +186,23 @@ def _resolve_single_path(
     return resolved_path
 
 
-def _execute_unity_build(unity_path: str, project_path: str, build_method: str) -> bool:
-    """Executes the Unity build process in batch mode."""
+def _read_stream_lines(stream, lines: List[str]) -> None:
+    """Reads a text stream to the end, collecting its lines without line endings."""
+    for line in stream:
+        lines.append(line.rstrip("\r\n"))
+
+
+def _execute_unity_build(
+    unity_path: str,
+    project_path: str,
+    build_method: str,
+    callbacks: Optional[PipelineCallbacks] = None,
+) -> bool:
+    """
+    Executes the Unity build process in batch mode.
+    stdout lines are streamed to on_unity_log as they arrive; stderr is collected
+    separately and logged as a warning after a successful build.
+    """
     log.info(f"Starting Unity build...")
     unity_args = [
         unity_path,
@@ -94,40 +217,58 @@ def _execute_unity_build(unity_path: str, project_path: str, build_method: str)
         "-",  # Log to stdout/stderr which subprocess captures
     ]
 
+    stdout_lines: List[str] = []
+    stderr_lines: List[str] = []
     try:
-        process = subprocess.run(
+        with subprocess.Popen(
             unity_args,
-            check=True,
-            capture_output=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
             text=True,
             encoding="utf-8",
             errors="replace",  # Keep replacing errors, common with Unity logs
-        )
-        log.info("Unity build process finished successfully.")
-        if process.stdout:  # Log stdout as well, as Unity might log info there
-            log.info("Unity Build Output (stdout):\\n%s", process.stdout.strip())
-        if process.stderr:
-            log.warning("Unity Build Output (stderr):\\n%s", process.stderr.strip())
-        return True
+        ) as process:
+            # Drain stderr on its own thread so a full pipe cannot block Unity
+            stderr_reader = threading.Thread(
+                target=_read_stream_lines,
+                args=(process.stderr, stderr_lines),
+                daemon=True,
+            )
+            stderr_reader.start()
+            try:
+                for line in process.stdout:
+                    line = line.rstrip("\r\n")
+                    stdout_lines.append(line)
+                    _emit(callbacks, "on_unity_log", line)
+                return_code = process.wait()
+            except BaseException:
+                process.kill()
+                raise
+            finally:
+                stderr_reader.join()
     except FileNotFoundError:
         log.error(
             f"ERROR: Failed to start Unity. Executable not found at: {unity_path}"
         )
         return False
-    except subprocess.CalledProcessError as e:
-        log.error(f"ERROR: Unity build failed with exit code {e.returncode}.")
-        stdout_content = e.stdout.strip() if e.stdout else "(empty)"
-        stderr_content = e.stderr.strip() if e.stderr else "(empty)"
-        log.error("Unity Output (stdout):\\n%s", stdout_content)
-        log.error("Unity Error Output (stderr):\\n%s", stderr_content)
-        if not stdout_content and not stderr_content:
+    except KeyboardInterrupt:
+        log.warning("KeyboardInterrupt detected. Aborting Unity build process.")
+        return False
+    except Exception:
+        log.exception("ERROR: An unexpected error occurred during Unity execution.")
+        return False
+
+    stdout = "\n".join(stdout_lines).strip()
+    stderr = "\n".join(stderr_lines).strip()
+    if return_code != 0:
+        log.error(f"ERROR: Unity build failed with exit code {return_code}.")
+        log.error("Unity Output (stdout):\\n%s", stdout or "(empty)")
+        log.error("Unity Error Output (stderr):\\n%s", stderr or "(empty)")
+        if not stdout and not stderr:
             log.warning(
                 "Unity provided no output to stdout or stderr. Check Unity Editor log file for details."
             )
             # You might need to locate the Unity log file path based on OS and Unity version
-            # Example for Windows: %USERPROFILE%\\AppData\\Local\\Unity\\Editor\\Editor.log
-            # Example for macOS: ~/Library/Logs/Unity/Editor.log
-            # Example for Linux: ~/.config/unity3d/Editor.log
             log.warning("Common Unity log locations:")
             log.warning(
                 "  Windows: %USERPROFILE%\\\\AppData\\\\Local\\\\Unity\\\\Editor\\\\Editor.log"
@@ -135,13 +276,13 @@ def _execute_unity_build(unity_path: str, project_path: str, build_method: str)
             log.warning("  macOS: ~/Library/Logs/Unity/Editor.log")
             log.warning("  Linux: ~/.config/unity3d/Editor.log")
         return False
-    except KeyboardInterrupt:
-        log.warning("KeyboardInterrupt detected. Aborting Unity build process.")
-        # Optionally, try to terminate the Unity process if needed, though subprocess.run should handle it
-        return False
-    except Exception:
-        log.exception("ERROR: An unexpected error occurred during Unity execution.")
-        return False
+
+    log.info("Unity build process finished successfully.")
+    if stdout:  # Log stdout as well, as Unity might log info there
+        log.info("Unity Build Output (stdout):\\n%s", stdout)
+    if stderr:
+        log.warning("Unity Build Output (stderr):\\n%s", stderr)
+    return True
 
 
 def _ensure_directory_exists(dir_path: str) -> bool:
@@ -184,13 +325,42 @@ def _determine_pattern_base_dir(source_pattern_abs: str, base_dir: str) -> str:
     return base_dir
 
 
-def _copy_item(item_abs_path: str, final_target_path: str, mapping: str) -> bool:
+def _copy_file(
+    src_path: str,
+    dst_path: str,
+    callbacks: Optional[PipelineCallbacks] = None,
+    optimized_textures: Optional[Dict[str, str]] = None,
+) -> str:
+    """
+    Copies a single file with metadata and reports the copied bytes.
+    Optimized textures are copied from the texture cache instead of the source.
+    """
+    src_path = _get_texture_source(src_path, optimized_textures)
+    result = shutil.copy2(src_path, dst_path)
+    _emit(callbacks, "on_bytes_copied", os.path.getsize(src_path))
+    return result
+
+
+def _copy_item(
+    item_abs_path: str,
+    final_target_path: str,
+    mapping: str,
+    callbacks: Optional[PipelineCallbacks] = None,
+    optimized_textures: Optional[Dict[str, str]] = None,
+) -> bool:
     """Unified copy of file or directory."""
     try:
         if os.path.isdir(item_abs_path):
-            shutil.copytree(item_abs_path, final_target_path, dirs_exist_ok=True)
+            shutil.copytree(
+                item_abs_path,
+                final_target_path,
+                dirs_exist_ok=True,
+                copy_function=lambda src, dst: _copy_file(
+                    src, dst, callbacks, optimized_textures
+                ),
+            )
         elif os.path.isfile(item_abs_path):
-            shutil.copy2(item_abs_path, final_target_path)
+            _copy_file(item_abs_path, final_target_path, callbacks, optimized_textures)
         else:
             log.warning(
                 f"Skipping copy: Source item is neither file nor directory: {item_abs_path}"
@@ -204,29 +374,173 @@ def _copy_item(item_abs_path: str, final_target_path: str, mapping: str) -> bool
         return False
 
 
-def _process_mapping(
-    mapping: str, source_base: str, target_base: str, mapping_type: str
+def _iter_item_files(item_abs_path: str, final_target_path: str):
+    """Yields (source_file, target_file) pairs for a file or directory item."""
+    if os.path.isfile(item_abs_path):
+        yield item_abs_path, final_target_path
+        return
+    for root, _, files in os.walk(item_abs_path):
+        rel_root = os.path.relpath(root, item_abs_path)
+        for name in files:
+            yield (
+                os.path.join(root, name),
+                os.path.normpath(os.path.join(final_target_path, rel_root, name)),
+            )
+
+
+def _stage_item(
+    item_abs_path: str,
+    final_target_path: str,
+    mapping: str,
+    target_base: str,
+    staging_dir: str,
+    staged_files: Dict[str, str],
+    callbacks: Optional[PipelineCallbacks] = None,
+    optimized_textures: Optional[Dict[str, str]] = None,
 ) -> Tuple[bool, int]:
     """
-    Unified handling of asset or output mapping.
+    Copies the changed files of an item into the staging directory.
+    Files identical to their live counterpart are skipped.
+    Each staged file is recorded as staged_files[live_path] = staged_path.
+    Items overlapping on a live path (e.g. 'dir/**') resolve to the last one,
+    matching a direct copy.
+    Returns (success, files_staged).
+    """
+    if not os.path.isdir(item_abs_path) and not os.path.isfile(item_abs_path):
+        log.warning(
+            f"Skipping copy: Source item is neither file nor directory: {item_abs_path}"
+        )
+        return True, 0
+    files_staged = 0
+    try:
+        for src_file, live_file in _iter_item_files(item_abs_path, final_target_path):
+            staged_path = os.path.join(
+                staging_dir, os.path.relpath(live_file, target_base)
+            )
+            if os.path.isfile(live_file) and filecmp.cmp(
+                _get_texture_source(src_file, optimized_textures),
+                live_file,
+                shallow=True,
+            ):
+                # Drop an earlier overlapping item's copy; the live file already matches
+                if staged_files.pop(live_file, None):
+                    os.remove(staged_path)
+                continue
+            os.makedirs(os.path.dirname(staged_path), exist_ok=True)
+            _copy_file(src_file, staged_path, callbacks, optimized_textures)
+            staged_files[live_file] = staged_path
+            files_staged += 1
+        return True, files_staged
+    except Exception:
+        log.exception(
+            f"ERROR: Failed to stage item '{item_abs_path}' for mapping '{mapping}' in '{staging_dir}'."
+        )
+        return False, files_staged
+
+
+def _backup_live_file(live_path: str, backup_path: str) -> None:
+    """Keeps a copy of a live file without removing it from its location."""
+    os.makedirs(os.path.dirname(backup_path), exist_ok=True)
+    try:
+        os.link(live_path, backup_path)
+    except OSError:  # No hard link support on this file system
+        shutil.copy2(live_path, backup_path)
+
+
+def _commit_staged_files(
+    staged_files: Dict[str, str], target_base: str, backup_dir: str
+) -> bool:
+    """
+    Swaps staged files into their live locations, one os.replace per file.
+    Each swap is atomic, so no file is ever seen half-written; the set of swaps
+    is not, but if one fails the files already swapped are restored from backups.
+    """
+    swapped: List[Tuple[str, Optional[str]]] = []  # (live_path, backup_path)
+    try:
+        for live_path, staged_path in staged_files.items():
+            backup_path = None
+            if os.path.isfile(live_path):
+                backup_path = os.path.join(
+                    backup_dir, os.path.relpath(live_path, target_base)
+                )
+                _backup_live_file(live_path, backup_path)
+            os.makedirs(os.path.dirname(live_path), exist_ok=True)
+            os.replace(staged_path, live_path)
+            swapped.append((live_path, backup_path))
+        return True
+    except OSError:
+        log.exception(
+            f"ERROR: Failed to swap in staged files. Restoring {len(swapped)} already swapped file(s)."
+        )
+        for live_path, backup_path in reversed(swapped):
+            try:
+                if backup_path:
+                    os.replace(backup_path, live_path)
+                else:
+                    os.remove(live_path)
+            except OSError:
+                log.exception(f"ERROR: Failed to restore '{live_path}'.")
+        return False
+
+
+def _get_staging_dir(target_dir: str, suffix: str = STAGING_DIR_SUFFIX) -> str:
+    """Returns a hidden sibling directory (staging by default) for a target directory."""
+    target_dir = os.path.normpath(target_dir)
+    return os.path.join(
+        os.path.dirname(target_dir),
+        f".{os.path.basename(target_dir)}{suffix}",
+    )
+
+
+def _is_inside_any(path: str, dir_paths: Set[str]) -> bool:
+    """Checks whether a path lies below any of the given normalized directories."""
+    current = os.path.normpath(path)
+    parent = os.path.dirname(current)
+    while parent != current:
+        if parent in dir_paths:
+            return True
+        current, parent = parent, os.path.dirname(parent)
+    return False
+
+
+@dataclass
+class _ResolvedMapping:
+    """A mapping with its strategy and the (item, final_target) pairs it matched."""
+
+    mapping: str
+    mapping_type: str
+    source_base: str
+    target_base: str
+    strategy: str = "preserve_structure"
+    includes_glob: bool = False
+    items: List[Tuple[str, str]] = field(default_factory=list)
+    success: bool = True
+
+
+def _resolve_mapping(
+    mapping: str, source_base: str, target_base: str, mapping_type: str
+) -> _ResolvedMapping:
+    """
+    Resolves an asset or output mapping to the items it copies.
     mapping_type: 'asset' or 'output'.
-    Returns (success, items_copied).
+    Creates the target directories; nothing is copied yet.
     """
-    overall_success = True
-    items_copied = 0
+    resolved = _ResolvedMapping(mapping, mapping_type, source_base, target_base)
     try:
         src_rel, tgt_rel = mapping.split(":", 1)
     except ValueError:
         log.error(
             f"ERROR: Skipping invalid {mapping_type} mapping format: '{mapping}'."
         )
-        return False, 0
+        resolved.success = False
+        return resolved
 
     src_abs = os.path.normpath(os.path.join(source_base, src_rel))
     tgt_abs = os.path.normpath(os.path.join(target_base, tgt_rel))
     pattern_base = _determine_pattern_base_dir(src_abs, source_base)
     includes_glob = any(ch in src_rel for ch in ["*", "?"])
     recursive = "**" in src_rel
+    resolved.includes_glob = includes_glob
 
     # Determine strategy
     strategy = "preserve_structure"
@@ -242,6 +556,7 @@ def _process_mapping(
                 strategy = "flatten"
             elif "/" not in last and not any(w in last for w in ["*", "?"]):
                 strategy = "flatten"
+    resolved.strategy = strategy
 
     # Ensure target exists
     ensure_dir = tgt_abs
@@ -249,14 +564,13 @@ def _process_mapping(
         log.error(
             f"ERROR: Cannot create target '{ensure_dir}' for mapping '{mapping}'."
         )
-        return False, 0
+        resolved.success = False
+        return resolved
 
     # Find items
     found = glob.glob(src_abs, recursive=recursive)
     if not found and not includes_glob and os.path.exists(src_abs):
         found = [src_abs]
-    if not found:
-        return True, 0
 
     for item in found:
         final_tgt = None
@@ -280,16 +594,90 @@ def _process_mapping(
             parent = os.path.dirname(final_tgt)
             if not _ensure_directory_exists(parent):
                 log.error(f"ERROR: Cannot create '{parent}' for item '{item}'.")
-                overall_success = False
+                resolved.success = False
                 continue
+        resolved.items.append((item, final_tgt))
 
-        rel_src = os.path.relpath(item, source_base)
-        rel_tgt = os.path.relpath(final_tgt, target_base)
-        if _copy_item(item, final_tgt, mapping):
-            if rel_src != rel_tgt or includes_glob:
-                log.info(f"  - {rel_src} -> {rel_tgt} (Strategy: {strategy})")
-            items_copied += 1
+    # 'dir/**' also matches everything inside matched directories; those are
+    # already copied with their directory
+    dir_items = {
+        os.path.normpath(item) for item, _ in resolved.items if os.path.isdir(item)
+    }
+    if dir_items:
+        resolved.items = [
+            (item, final_tgt)
+            for item, final_tgt in resolved.items
+            if not _is_inside_any(item, dir_items)
+        ]
+
+    return resolved
+
+
+def _resolve_mappings(
+    mappings: List[str],
+    source_base: str,
+    target_base: str,
+    mapping_type: str,
+    texture_options: Optional[TextureOptions] = None,
+) -> Tuple[List[_ResolvedMapping], Dict[str, str]]:
+    """
+    Resolves all mappings of one copy step, then runs the optional texture stage.
+    Returns (resolved_mappings, optimized_textures).
+    """
+    resolved_mappings = [
+        _resolve_mapping(mapping, source_base, target_base, mapping_type)
+        for mapping in mappings
+    ]
+    optimized_textures: Dict[str, str] = {}
+    if texture_options:
+        optimized_textures = _optimize_textures(
+            resolved_mappings, texture_options, mapping_type
+        )
+    return resolved_mappings, optimized_textures
+
+
+def _process_mapping(
+    resolved: _ResolvedMapping,
+    staging_dir: Optional[str] = None,
+    staged_files: Optional[Dict[str, str]] = None,
+    callbacks: Optional[PipelineCallbacks] = None,
+    optimized_textures: Optional[Dict[str, str]] = None,
+) -> Tuple[bool, int]:
+    """
+    Copies the items of a resolved asset or output mapping.
+    If staging_dir is given, changed files are staged instead of copied live;
+    items whose files are all up to date do not count as copied.
+    Returns (success, items_copied).
+    """
+    overall_success = resolved.success
+    items_copied = 0
+
+    for item, final_tgt in resolved.items:
+        rel_src = os.path.relpath(item, resolved.source_base)
+        rel_tgt = os.path.relpath(final_tgt, resolved.target_base)
+        copied_anything = True
+        if staging_dir is not None:
+            copied, files_staged = _stage_item(
+                item,
+                final_tgt,
+                resolved.mapping,
+                resolved.target_base,
+                staging_dir,
+                staged_files,
+                callbacks,
+                optimized_textures,
+            )
+            copied_anything = files_staged > 0
         else:
+            copied = _copy_item(
+                item, final_tgt, resolved.mapping, callbacks, optimized_textures
+            )
+        if copied and copied_anything:
+            if rel_src != rel_tgt or resolved.includes_glob:
+                log.info(f"  - {rel_src} -> {rel_tgt} (Strategy: {resolved.strategy})")
+            items_copied += 1
+            _emit(callbacks, "on_item_copied", resolved.mapping_type, item, final_tgt)
+        elif not copied:
             overall_success = False
 
     return overall_success, items_copied
@@ -299,6 +687,8 @@ def _copy_source_assets(
     asset_mappings: List[str],
     target_mod_dir: str,
     unity_project_path: str,
+    callbacks: Optional[PipelineCallbacks] = None,
+    texture_options: Optional[TextureOptions] = None,
 ) -> bool:  # Changed return type
     """
     Copies source assets based on mapping patterns.
@@ -315,9 +705,12 @@ def _copy_source_assets(
     overall_success = True
     items_copied_count = 0
 
-    for mapping in asset_mappings:
+    resolved_mappings, optimized_textures = _resolve_mappings(
+        asset_mappings, target_mod_dir, unity_project_path, "asset", texture_options
+    )
+    for resolved in resolved_mappings:
         success, count = _process_mapping(
-            mapping, target_mod_dir, unity_project_path, "asset"
+            resolved, callbacks=callbacks, optimized_textures=optimized_textures
         )
         overall_success &= success
         items_copied_count += count
@@ -335,17 +728,31 @@ def _copy_mapped_outputs(
     output_mappings: List[str],
     unity_project_path: str,
     target_mod_dir: str,
+    staged_deploy: bool = False,
+    callbacks: Optional[PipelineCallbacks] = None,
+    texture_options: Optional[TextureOptions] = None,
 ) -> bool:  # Changed return type
     """Copies build outputs and logs operations with relative paths."""
     if not output_mappings:
         return True
+    if staged_deploy:
+        return _deploy_mapped_outputs_staged(
+            output_mappings,
+            unity_project_path,
+            target_mod_dir,
+            callbacks,
+            texture_options,
+        )
 
     overall_success = True
     items_copied_count = 0
 
-    for mapping in output_mappings:
+    resolved_mappings, optimized_textures = _resolve_mappings(
+        output_mappings, unity_project_path, target_mod_dir, "output", texture_options
+    )
+    for resolved in resolved_mappings:
         success, count = _process_mapping(
-            mapping, unity_project_path, target_mod_dir, "output"
+            resolved, callbacks=callbacks, optimized_textures=optimized_textures
         )
         overall_success &= success
         items_copied_count += count
@@ -360,6 +767,518 @@ def _copy_mapped_outputs(
     return overall_success
 
 
+def _deploy_mapped_outputs_staged(
+    output_mappings: List[str],
+    unity_project_path: str,
+    target_mod_dir: str,
+    callbacks: Optional[PipelineCallbacks] = None,
+    texture_options: Optional[TextureOptions] = None,
+) -> bool:
+    """
+    Deploys build outputs through a sibling staging directory.
+    Only files that differ from the live mod directory are staged.
+    They are swapped in file by file with os.replace once every mapping has
+    staged cleanly, so readers never see a half-written file. A failed staging
+    step leaves the mod directory untouched; a failed swap is rolled back.
+    """
+    staging_dir = _get_staging_dir(target_mod_dir)
+    backup_dir = _get_staging_dir(target_mod_dir, BACKUP_DIR_SUFFIX)
+    # Leftovers from an interrupted run are never valid
+    shutil.rmtree(staging_dir, ignore_errors=True)
+    shutil.rmtree(backup_dir, ignore_errors=True)
+
+    overall_success = True
+    staged_files: Dict[str, str] = {}  # live_path -> staged_path
+
+    try:
+        resolved_mappings, optimized_textures = _resolve_mappings(
+            output_mappings,
+            unity_project_path,
+            target_mod_dir,
+            "output",
+            texture_options,
+        )
+        for resolved in resolved_mappings:
+            success, _ = _process_mapping(
+                resolved,
+                staging_dir=staging_dir,
+                staged_files=staged_files,
+                callbacks=callbacks,
+                optimized_textures=optimized_textures,
+            )
+            overall_success &= success
+
+        if not overall_success:
+            log.error(
+                "Build output staging finished with errors. Mod directory left unchanged."
+            )
+            return False
+
+        if not any(resolved.items for resolved in resolved_mappings):
+            log.info("  (No items matched the provided output mappings)")
+            return True
+        if not staged_files:
+            log.info("  (All build outputs are up to date)")
+            return True
+
+        if not _commit_staged_files(staged_files, target_mod_dir, backup_dir):
+            log.error("Build output deploy failed and was rolled back.")
+            return False
+        log.info(f"  Deployed {len(staged_files)} changed file(s).")
+        return True
+    finally:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        shutil.rmtree(backup_dir, ignore_errors=True)
+
+
+# =============================================================================
+# Texture Optimization
+# =============================================================================
+
+
+def _png_chunk(chunk_type: bytes, body: bytes) -> bytes:
+    """Serializes a PNG chunk with its length and CRC."""
+    crc = zlib.crc32(chunk_type + body) & 0xFFFFFFFF
+    return struct.pack(">I", len(body)) + chunk_type + body + struct.pack(">I", crc)
+
+
+def _read_png_chunks(data: bytes) -> List[Tuple[bytes, bytes]]:
+    """Splits PNG data into (chunk_type, body) pairs. Raises ValueError if malformed."""
+    if not data.startswith(PNG_SIGNATURE):
+        raise ValueError("not a PNG file")
+    chunks = []
+    pos = len(PNG_SIGNATURE)
+    while pos + 12 <= len(data):
+        length, chunk_type = struct.unpack(">I4s", data[pos : pos + 8])
+        body = data[pos + 8 : pos + 8 + length]
+        crc_bytes = data[pos + 8 + length : pos + 12 + length]
+        if len(crc_bytes) != 4:
+            raise ValueError(f"truncated {chunk_type!r} chunk")
+        if (
+            struct.unpack(">I", crc_bytes)[0]
+            != zlib.crc32(chunk_type + body) & 0xFFFFFFFF
+        ):
+            raise ValueError(f"CRC mismatch in {chunk_type!r} chunk")
+        chunks.append((chunk_type, body))
+        pos += 12 + length
+        if chunk_type == b"IEND":
+            break
+    if not chunks or chunks[0][0] != b"IHDR" or chunks[-1][0] != b"IEND":
+        raise ValueError("missing IHDR or IEND chunk")
+    return chunks
+
+
+def _paeth(left: int, up: int, up_left: int) -> int:
+    """PNG Paeth predictor."""
+    p = left + up - up_left
+    pa, pb, pc = abs(p - left), abs(p - up), abs(p - up_left)
+    if pa <= pb and pa <= pc:
+        return left
+    return up if pb <= pc else up_left
+
+
+class _ByteLanes:
+    """
+    Whole-row byte arithmetic modulo 256, done on rows packed into Python ints
+    (SWAR) so the per-byte work runs in C instead of Python loops.
+    """
+
+    def __init__(self, row_bytes: int, bpp: int):
+        self.row_bytes = row_bytes
+        self.pixel_shift = 8 * bpp
+        self.high = int.from_bytes(b"\x80" * row_bytes, "big")
+        self.low = int.from_bytes(b"\x7f" * row_bytes, "big")
+        self.even = int.from_bytes(b"\xfe" * row_bytes, "big")
+
+    def pack(self, row: bytes) -> int:
+        return int.from_bytes(row, "big")
+
+    def unpack(self, lanes: int) -> bytes:
+        return lanes.to_bytes(self.row_bytes, "big")
+
+    def left(self, a: int) -> int:
+        """Shifts every byte one pixel to the right, filling with zeros."""
+        return a >> self.pixel_shift
+
+    def add(self, a: int, b: int) -> int:
+        return ((a & self.low) + (b & self.low)) ^ ((a ^ b) & self.high)
+
+    def sub(self, a: int, b: int) -> int:
+        return ((a | self.high) - (b & self.low)) ^ ((a ^ b ^ self.high) & self.high)
+
+    def average(self, a: int, b: int) -> int:
+        """Per-byte floor((a + b) / 2)."""
+        return (a & b) + (((a ^ b) & self.even) >> 1)
+
+    def prefix_sum(self, a: int) -> int:
+        """Per-byte running sum over pixels (reverses the Sub filter)."""
+        shift = self.pixel_shift
+        while shift < 8 * self.row_bytes:
+            a = self.add(a, a >> shift)
+            shift *= 2
+        return a
+
+
+def _unfilter_scanlines(raw: bytes, height: int, row_bytes: int, bpp: int) -> bytes:
+    """Reverses PNG scanline filtering. Returns the raw pixel rows without filter bytes."""
+    stride = row_bytes + 1
+    if len(raw) < stride * height:
+        raise ValueError("image data is shorter than expected")
+    lanes = _ByteLanes(row_bytes, bpp)
+    pixels = bytearray()
+    prev = bytes(row_bytes)
+    for y in range(height):
+        filter_type = raw[y * stride]
+        row = raw[y * stride + 1 : (y + 1) * stride]
+        if filter_type == 1:
+            row = lanes.unpack(lanes.prefix_sum(lanes.pack(row)))
+        elif filter_type == 2:
+            row = lanes.unpack(lanes.add(lanes.pack(row), lanes.pack(prev)))
+        elif filter_type == 3:
+            # Each byte depends on its decoded left neighbour; no row-wide shortcut
+            row = bytearray(row)
+            for i in range(row_bytes):
+                left = row[i - bpp] if i >= bpp else 0
+                row[i] = (row[i] + ((left + prev[i]) >> 1)) & 0xFF
+            row = bytes(row)
+        elif filter_type == 4:
+            # Paeth predictor inlined: this loop dominates decoding time
+            row = bytearray(row)
+            for i in range(row_bytes):
+                up = prev[i]
+                if i >= bpp:
+                    left, up_left = row[i - bpp], prev[i - bpp]
+                else:
+                    left = up_left = 0
+                pa = up - up_left if up > up_left else up_left - up
+                pb = left - up_left if left > up_left else up_left - left
+                pc = left + up - 2 * up_left
+                if pc < 0:
+                    pc = -pc
+                if pa <= pb and pa <= pc:
+                    row[i] = (row[i] + left) & 0xFF
+                elif pb <= pc:
+                    row[i] = (row[i] + up) & 0xFF
+                else:
+                    row[i] = (row[i] + up_left) & 0xFF
+            row = bytes(row)
+        elif filter_type != 0:
+            raise ValueError(f"invalid filter type {filter_type}")
+        pixels += row
+        prev = row
+    return bytes(pixels)
+
+
+def _paeth_filter_scanline(row: bytes, prev: bytes, bpp: int) -> bytes:
+    """Applies the Paeth filter to a scanline (per byte; only used on small images)."""
+    return bytes(
+        (
+            row[i]
+            - _paeth(
+                row[i - bpp] if i >= bpp else 0,
+                prev[i],
+                prev[i - bpp] if i >= bpp else 0,
+            )
+        )
+        & 0xFF
+        for i in range(len(row))
+    )
+
+
+def _filter_candidates(
+    pixels: bytes,
+    height: int,
+    row_bytes: int,
+    bpp: int,
+    full_search: bool,
+    low_depth: bool = False,
+) -> List[bytes]:
+    """
+    Builds filtered image streams. The adaptive stream picks the filter with the
+    minimum sum of absolute differences per row, the usual encoder heuristic.
+    - full_search: Streams for each fixed filter type (0-4) plus the adaptive one.
+    - otherwise: Only the adaptive stream, plus the unfiltered one if low_depth
+      (palette or sub-byte images, where no filtering usually wins). Paeth is left
+      out of the adaptive choice because it has no row-wide implementation.
+    """
+    lanes = _ByteLanes(row_bytes, bpp)
+    filter_types = range(5) if full_search else range(4)
+    fixed_types = filter_types if full_search else ((0,) if low_depth else ())
+    fixed_streams = {ft: bytearray() for ft in fixed_types}
+    adaptive_stream = bytearray()
+    prev = bytes(row_bytes)
+    for y in range(height):
+        row = pixels[y * row_bytes : (y + 1) * row_bytes]
+        row_lanes, prev_lanes = lanes.pack(row), lanes.pack(prev)
+        left_lanes = lanes.left(row_lanes)
+        filtered_rows = [
+            row,
+            lanes.unpack(lanes.sub(row_lanes, left_lanes)),
+            lanes.unpack(lanes.sub(row_lanes, prev_lanes)),
+            lanes.unpack(lanes.sub(row_lanes, lanes.average(left_lanes, prev_lanes))),
+        ]
+        if full_search:
+            filtered_rows.append(_paeth_filter_scanline(row, prev, bpp))
+        for filter_type, stream in fixed_streams.items():
+            stream.append(filter_type)
+            stream += filtered_rows[filter_type]
+        best_type = min(
+            filter_types,
+            key=lambda ft: sum(filtered_rows[ft].translate(PNG_FILTER_COST_TABLE)),
+        )
+        adaptive_stream.append(best_type)
+        adaptive_stream += filtered_rows[best_type]
+        prev = row
+    return [bytes(stream) for stream in fixed_streams.values()] + [
+        bytes(adaptive_stream)
+    ]
+
+
+def _deflate_smallest(streams: List[bytes], full_search: bool = True) -> bytes:
+    """
+    Compresses each stream and returns the smallest result.
+    Full search tries every level/strategy pair; otherwise only the highest
+    level with the default strategy.
+    """
+    levels = PNG_DEFLATE_LEVELS if full_search else PNG_DEFLATE_LEVELS[-1:]
+    strategies = PNG_DEFLATE_STRATEGIES if full_search else PNG_DEFLATE_STRATEGIES[:1]
+    best: Optional[bytes] = None
+    for stream in streams:
+        for level in levels:
+            for strategy in strategies:
+                compressor = zlib.compressobj(level, zlib.DEFLATED, 15, 9, strategy)
+                compressed = compressor.compress(stream) + compressor.flush()
+                if best is None or len(compressed) < len(best):
+                    best = compressed
+    return best
+
+
+def _optimize_png_bytes(data: bytes) -> bytes:
+    """
+    Losslessly re-encodes PNG data: strips metadata chunks, merges IDAT chunks
+    and picks the smallest filter/deflate combination (exhaustively for small images).
+    Interlaced images keep their filtering and are only re-deflated.
+    The result is decoded and compared with the original image data before use;
+    a mismatch raises ValueError.
+    Returns the original data if it cannot be made smaller.
+    """
+    chunks = _read_png_chunks(data)
+    width, height, bit_depth, color_type, _, _, interlace = struct.unpack(
+        ">IIBBBBB", chunks[0][1]
+    )
+    if color_type not in PNG_CHANNELS_BY_COLOR_TYPE:
+        raise ValueError(f"unsupported color type {color_type}")
+    bits_per_pixel = PNG_CHANNELS_BY_COLOR_TYPE[color_type] * bit_depth
+    row_bytes = (width * bits_per_pixel + 7) // 8
+    bpp = max(1, bits_per_pixel // 8)
+
+    raw = zlib.decompress(b"".join(body for ctype, body in chunks if ctype == b"IDAT"))
+    full_search = row_bytes * height <= PNG_FULL_SEARCH_MAX_BYTES
+    if interlace:
+        idat = _deflate_smallest([raw], full_search)
+        if zlib.decompress(idat) != raw:
+            raise ValueError("re-encoded image data does not match the original")
+    else:
+        pixels = _unfilter_scanlines(raw, height, row_bytes, bpp)
+        idat = _deflate_smallest(
+            _filter_candidates(
+                pixels,
+                height,
+                row_bytes,
+                bpp,
+                full_search,
+                low_depth=color_type == 3 or bit_depth < 8,
+            ),
+            full_search,
+        )
+        # Guard against encoder bugs: every result is decoded and compared
+        if _unfilter_scanlines(zlib.decompress(idat), height, row_bytes, bpp) != pixels:
+            raise ValueError("re-encoded image data does not match the original")
+
+    output = bytearray(PNG_SIGNATURE)
+    idat_written = False
+    for chunk_type, body in chunks:
+        if chunk_type == b"IDAT":
+            if not idat_written:
+                output += _png_chunk(b"IDAT", idat)
+                idat_written = True
+        elif chunk_type[0] & 0x20 == 0 or chunk_type in PNG_KEPT_ANCILLARY_CHUNKS:
+            # Uppercase first letter marks a critical chunk
+            output += _png_chunk(chunk_type, body)
+
+    return bytes(output) if len(output) < len(data) else data
+
+
+def _optimize_texture_file(src_path: str, cache_path: str) -> Optional[str]:
+    """
+    Process pool worker: writes the optimized PNG to its cache path.
+    Returns an error message on failure.
+    """
+    temp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        with open(src_path, "rb") as f:
+            optimized = _optimize_png_bytes(f.read())
+        with open(temp_path, "wb") as f:
+            f.write(optimized)
+        os.replace(temp_path, cache_path)
+        return None
+    except Exception as e:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass  # Never created, or already moved into place
+        return f"{type(e).__name__}: {e}"
+
+
+def _get_texture_cache_path(src_path: str, cache_dir: str) -> str:
+    """Returns the content-addressed cache path for a source PNG."""
+    digest = hashlib.sha256(f"png-v{PNG_OPTIMIZER_VERSION}:".encode())
+    with open(src_path, "rb") as f:
+        digest.update(f.read())
+    return os.path.join(cache_dir, f"{digest.hexdigest()}.png")
+
+
+def _get_texture_source(
+    src_path: str, optimized_textures: Optional[Dict[str, str]]
+) -> str:
+    """Returns the optimized cache file for a source PNG, or the source itself."""
+    if not optimized_textures:
+        return src_path
+    return optimized_textures.get(os.fspath(src_path), src_path)
+
+
+def _run_texture_jobs(
+    pending: Dict[str, str], workers: Optional[int]
+) -> Dict[str, str]:
+    """
+    Optimizes {cache_path: src_path} jobs, in a process pool when worthwhile.
+    Returns {cache_path: error_message} for failed jobs.
+    """
+    results: Dict[str, Optional[str]] = {}
+    if len(pending) > 1 and workers != 1:
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {
+                    cache_path: pool.submit(_optimize_texture_file, src, cache_path)
+                    for cache_path, src in pending.items()
+                }
+                for cache_path, future in futures.items():
+                    results[cache_path] = future.result()
+        except (OSError, NotImplementedError, BrokenProcessPool):
+            # Unavailable pool, or a worker died (e.g. out of memory)
+            log.warning(
+                "Process pool failed; optimizing remaining textures sequentially."
+            )
+    for cache_path, src in pending.items():
+        if cache_path not in results:
+            results[cache_path] = _optimize_texture_file(src, cache_path)
+    return {cache_path: error for cache_path, error in results.items() if error}
+
+
+def _format_size(size: int) -> str:
+    """Formats a byte count for log output."""
+    return f"{size / 1024:.1f} KB"
+
+
+def _report_texture_sizes(
+    png_targets: List[Tuple[str, str, str]],
+    optimized_textures: Dict[str, str],
+    budgets: Dict[str, int],
+) -> None:
+    """Logs PNG sizes per target directory and checks them against size budgets."""
+    dir_sizes: Dict[str, List[int]] = {}  # rel_dir -> [count, original, optimized]
+    for src_file, tgt_file, target_base in png_targets:
+        rel_dir = os.path.dirname(os.path.relpath(tgt_file, target_base)) or "."
+        sizes = dir_sizes.setdefault(rel_dir, [0, 0, 0])
+        sizes[0] += 1
+        sizes[1] += os.path.getsize(src_file)
+        sizes[2] += os.path.getsize(_get_texture_source(src_file, optimized_textures))
+
+    for rel_dir, (count, original, optimized) in sorted(dir_sizes.items()):
+        log.info(
+            f"  Textures in '{rel_dir}': {count} file(s), {_format_size(original)} -> {_format_size(optimized)}"
+        )
+
+    for budget_dir, budget in budgets.items():
+        budget_dir = os.path.normpath(budget_dir)
+        matched = [
+            sizes
+            for rel_dir, sizes in dir_sizes.items()
+            if budget_dir == "."
+            or rel_dir == budget_dir
+            or rel_dir.startswith(budget_dir + os.sep)
+        ]
+        if not matched:
+            continue
+        total = sum(sizes[2] for sizes in matched)
+        if total > budget:
+            log.warning(
+                f"WARNING: Texture budget exceeded for '{budget_dir}': {_format_size(total)} > {_format_size(budget)}"
+            )
+        else:
+            log.info(
+                f"  Texture budget '{budget_dir}': {_format_size(total)} of {_format_size(budget)}"
+            )
+
+
+def _optimize_textures(
+    resolved_mappings: List[_ResolvedMapping],
+    options: TextureOptions,
+    mapping_type: str,
+) -> Dict[str, str]:
+    """
+    Texture stage between mapping resolution and copy.
+    Losslessly recompresses every PNG the mappings would copy into a
+    content-addressed cache, so each unique image is optimized only once.
+    Returns {source_png: cached_png} for successfully optimized files.
+    """
+    png_targets: Dict[str, Tuple[str, str, str]] = (
+        {}
+    )  # Keyed by target; items may overlap
+    for resolved in resolved_mappings:
+        for item, final_tgt in resolved.items:
+            for src_file, tgt_file in _iter_item_files(item, final_tgt):
+                if src_file.lower().endswith(".png"):
+                    png_targets[tgt_file] = (src_file, tgt_file, resolved.target_base)
+    if not png_targets:
+        return {}
+    if not _ensure_directory_exists(options.cache_dir):
+        log.warning("Texture cache unavailable; copying textures unoptimized.")
+        return {}
+
+    optimized_textures: Dict[str, str] = {}
+    pending: Dict[str, str] = {}  # cache_path -> representative source
+    for src_file, _, _ in png_targets.values():
+        if src_file in optimized_textures:
+            continue
+        try:
+            cache_path = _get_texture_cache_path(src_file, options.cache_dir)
+        except OSError:
+            log.exception(f"ERROR: Could not read texture '{src_file}'.")
+            continue
+        optimized_textures[src_file] = cache_path
+        if not os.path.isfile(cache_path):
+            pending.setdefault(cache_path, src_file)
+
+    if pending:
+        log.info(f"  Optimizing {len(pending)} unique texture(s)...")
+        failed = _run_texture_jobs(pending, options.workers)
+        for cache_path, error in failed.items():
+            log.warning(
+                f"WARNING: Texture optimization failed for '{pending[cache_path]}' ({error}). Copying it unoptimized."
+            )
+        optimized_textures = {
+            src: cache_path
+            for src, cache_path in optimized_textures.items()
+            if cache_path not in failed
+        }
+
+    # Budgets describe the shipped mod dir, i.e. the output step's target
+    budgets = options.budgets if mapping_type == "output" else {}
+    _report_texture_sizes(list(png_targets.values()), optimized_textures, budgets)
+    return optimized_textures
+
+
 # =============================================================================
 # Pre-Check Helper
 # =============================================================================
@@ -434,6 +1353,31 @@ def _pre_check_all_mappings(
 # =============================================================================
 
 
+def _prompt_manual_build(unity_project_path: str) -> bool:
+    """Asks the user to run the Unity build manually. Returns False if cancelled."""
+    print("\n" + "-" * 60)  # Fixed newline
+    print(f"ACTION REQUIRED:")
+    print(f"1. Open the Unity project: {unity_project_path}")
+    print(f"2. Manually trigger the AssetBundle build process in the Unity Editor.")
+    print(f"   (Ensure output matches expected location for Step 3, if applicable)")
+    print(f"3. Wait for the Unity build to complete.")
+    print("-" * 60)
+    try:
+        input(
+            "--> Press Enter here once the manual Unity build is finished, or Ctrl+C to cancel... "
+        )
+        log.info("Resuming script after manual build confirmation.")
+        return True
+    except KeyboardInterrupt:
+        return False
+
+
+def _assume_manual_build_done(unity_project_path: str) -> bool:
+    """Non-blocking manual build hook: uses the build outputs already present."""
+    log.info("Using existing build outputs (no manual build hook set).")
+    return True
+
+
 def orchestrate_build_and_copy(
     target_mod_dir: str,
     unity_path: Optional[str],
@@ -441,6 +1385,9 @@ def orchestrate_build_and_copy(
     asset_mappings: Optional[List[str]],
     output_mappings: Optional[List[str]],
     build_method: Optional[str],
+    staged_deploy: bool = False,
+    callbacks: Optional[PipelineCallbacks] = None,
+    texture_options: Optional[TextureOptions] = None,
 ) -> int:  # Return exit code
     """Orchestrates the AssetBundle build and copy process."""
 
@@ -454,11 +1401,22 @@ def orchestrate_build_and_copy(
     copy_assets_success = True
     if asset_mappings:
         log.info("Step 1: Copying source assets...")
+        step_started = time.perf_counter()
         copy_assets_success = _copy_source_assets(
-            asset_mappings, target_mod_dir, unity_project_path
+            asset_mappings,
+            target_mod_dir,
+            unity_project_path,
+            callbacks,
+            texture_options,
         )
         if copy_assets_success:
             log.info("Step 1: Finished copying source assets.")  # Simple finish log
+            _emit(
+                callbacks,
+                "on_stage_finished",
+                "assets",
+                time.perf_counter() - step_started,
+            )
         if not copy_assets_success:
             return 1
     else:
@@ -468,24 +1426,23 @@ def orchestrate_build_and_copy(
     build_success = True
     if not is_manual_mode:
         log.info("Step 2: Executing automatic Unity build...")
-        if not _execute_unity_build(unity_path, unity_project_path, build_method):
+        step_started = time.perf_counter()
+        if not _execute_unity_build(
+            unity_path, unity_project_path, build_method, callbacks
+        ):
             return 1
         # Success message logged in _execute_unity_build
+        _emit(
+            callbacks, "on_stage_finished", "build", time.perf_counter() - step_started
+        )
     else:
         log.info("Step 2: Manual build required.")
-        print("\n" + "-" * 60)  # Fixed newline
-        print(f"ACTION REQUIRED:")
-        print(f"1. Open the Unity project: {unity_project_path}")
-        print(f"2. Manually trigger the AssetBundle build process in the Unity Editor.")
-        print(f"   (Ensure output matches expected location for Step 3, if applicable)")
-        print(f"3. Wait for the Unity build to complete.")
-        print("-" * 60)
-        try:
-            input(
-                "--> Press Enter here once the manual Unity build is finished, or Ctrl+C to cancel... "
-            )
-            log.info("Resuming script after manual build confirmation.")
-        except KeyboardInterrupt:
+        confirm_manual_build = (
+            callbacks.on_manual_build
+            if callbacks and callbacks.on_manual_build
+            else _prompt_manual_build
+        )
+        if not confirm_manual_build(unity_project_path):
             log.info(
                 "Script interrupted by user during manual build pause. Exiting gracefully."
             )
@@ -495,11 +1452,23 @@ def orchestrate_build_and_copy(
     copy_outputs_success = True
     if output_mappings:
         log.info("Step 3: Copying build outputs...")
+        step_started = time.perf_counter()
         copy_outputs_success = _copy_mapped_outputs(
-            output_mappings, unity_project_path, target_mod_dir
+            output_mappings,
+            unity_project_path,
+            target_mod_dir,
+            staged_deploy,
+            callbacks,
+            texture_options,
         )
         if copy_outputs_success:
             log.info("Step 3: Finished copying build outputs.")  # Simple finish log
+            _emit(
+                callbacks,
+                "on_stage_finished",
+                "outputs",
+                time.perf_counter() - step_started,
+            )
         if not copy_outputs_success:
             return 1
     else:
@@ -524,18 +1493,20 @@ def orchestrate_build_and_copy(
 def _parse_arguments() -> argparse.Namespace:
     """Parses command-line arguments."""
     parser = argparse.ArgumentParser(
-        description="Builds Unity AssetBundles and copies assets/outputs.",
+        description="Builds Unity AssetBundles and copies assets/outputs. Use the 'history' command to inspect past runs.",
         formatter_class=argparse.ArgumentDefaultsHelpFormatter,
     )
 
     # --- Base Paths ---
     parser.add_argument(
         "--unity-project-path",
-        required=True,
-        help="Path to the Unity project root directory.",
+        default=None,
+        help="Path to the Unity project root directory. Required unless a command is given.",
     )
     parser.add_argument(
-        "--target-mod-dir", required=True, help="Path to the target mod root directory."
+        "--target-mod-dir",
+        default=None,
+        help="Path to the target mod root directory. Required unless a command is given.",
     )
 
     # --- Unity Build Parameters ---
@@ -566,7 +1537,71 @@ def _parse_arguments() -> argparse.Namespace:
         help="Copy build outputs in the same way as source assets: 'source:target'. Source relative to Unity project (file/dir/glob), target relative to mod dir. Supports glob patterns, recursive '**', and preserves structure similarly.",
     )
 
-    return parser.parse_args()
+    # --- Deploy Options ---
+    parser.add_argument(
+        "--staged-deploy",
+        action="store_true",
+        help="Stage changed build outputs in a sibling directory of the target mod dir, then swap each file in atomically. Avoids half-written files being read by a running game or mod reloader.",
+    )
+
+    # --- Texture Optimization ---
+    parser.add_argument(
+        "--optimize-textures",
+        action="store_true",
+        help="Losslessly recompress copied PNG files (strip metadata, pick best filter and deflate level) before they are copied.",
+    )
+    parser.add_argument(
+        "--texture-cache-dir",
+        default=TEXTURE_CACHE_DIR,
+        help="Cache of optimized PNGs, keyed by content hash. Relative to the working directory.",
+    )
+    parser.add_argument(
+        "--texture-budget",
+        action="append",
+        default=[],
+        metavar="DIR:KB",
+        help="Size budget for optimized PNGs under a directory of the target mod dir (e.g. 'Textures:256'). Checked in the build output step (Step 3) only, as the mod dir is what ships; source assets copied into the Unity project are not budgeted. Exceeding it logs a warning.",
+    )
+    parser.add_argument(
+        "--texture-workers",
+        type=_positive_int,
+        default=None,
+        help="Number of processes used to optimize textures. Defaults to the CPU count.",
+    )
+
+    # --- Build History ---
+    parser.add_argument(
+        "--history-file",
+        default=HISTORY_FILE,
+        help="Append each successful run (input fingerprint, output sizes and hashes, stage durations) to this JSONL file. Inspect it with the 'history diff' and 'history trend' commands.",
+    )
+    parser.add_argument(
+        "--no-history",
+        action="store_true",
+        help="Do not record this run in the build history.",
+    )
+
+    # --- Commands ---
+    commands = parser.add_subparsers(
+        title="commands",
+        dest="command",
+        description="Without a command, the build and copy process runs.",
+    )
+    _add_history_command(commands)
+
+    args = parser.parse_args()
+    if args.command is None:
+        missing = [
+            option
+            for option, value in (
+                ("--unity-project-path", args.unity_project_path),
+                ("--target-mod-dir", args.target_mod_dir),
+            )
+            if value is None
+        ]
+        if missing:
+            parser.error(f"the following arguments are required: {', '.join(missing)}")
+    return args
 
 
 def _resolve_paths(
@@ -698,39 +1733,575 @@ def _validate_required_paths(
     return True
 
 
-def main():
-    """Main entry point for the script."""
-    args = _parse_arguments()
-    workspace_root = os.getcwd()
+def _parse_texture_budgets(budget_args: List[str]) -> Dict[str, int]:
+    """Parses 'DIR:KB' budget arguments into {dir: bytes}."""
+    budgets = {}
+    for budget_arg in budget_args:
+        budget_dir, _, size_kb = budget_arg.rpartition(":")
+        try:
+            budget = int(float(size_kb) * 1024)
+        except (ValueError, OverflowError):
+            raise PipelineConfigError(
+                f"invalid --texture-budget '{budget_arg}', expected 'DIR:KB'"
+            )
+        if budget < 1:
+            raise PipelineConfigError(
+                f"invalid --texture-budget '{budget_arg}', the size must be positive"
+            )
+        budgets[budget_dir or "."] = budget
+    return budgets
 
-    resolved_paths = _resolve_paths(args, workspace_root)
 
-    # Validate base paths and unity path (if needed) first
-    if not _validate_required_paths(resolved_paths, args, workspace_root):
-        log.critical("Aborting due to invalid configuration or missing required paths.")
-        sys.exit(1)
+# =============================================================================
+# Build History
+# =============================================================================
+
+
+def _hash_file(file_path: str) -> str:
+    """Returns the SHA-256 hex digest of a file."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _compute_input_fingerprint(
+    build_method: Optional[str],
+    asset_mappings: List[str],
+    output_mappings: List[str],
+    asset_files: Dict[str, str],
+    mode: str,
+    options: Dict[str, Any],
+) -> str:
+    """
+    Fingerprints the build inputs: the configuration, run mode and options plus
+    the content of every source asset copied into the Unity project ({rel_path: abs_path}).
+    Runs without asset mappings are fingerprinted by configuration only.
+    """
+    digest = hashlib.sha256()
+    config = {
+        "build_method": build_method,
+        "asset_mappings": asset_mappings,
+        "output_mappings": output_mappings,
+        "mode": mode,
+        "options": options,
+    }
+    digest.update(json.dumps(config, sort_keys=True).encode())
+    for rel_path in sorted(asset_files):
+        digest.update(f"{rel_path}\0{_hash_file(asset_files[rel_path])}\n".encode())
+    return digest.hexdigest()[:16]
+
+
+def _append_history_record(history_file: str, record: Dict[str, Any]) -> None:
+    """Appends one run record to the JSONL history file."""
+    parent = os.path.dirname(history_file)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+    with open(history_file, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, sort_keys=True, separators=(",", ":")) + "\n")
+
+
+def _load_history(history_file: str) -> List[Dict[str, Any]]:
+    """Loads all run records, oldest first. Lines that are not JSON objects are skipped."""
+    if not os.path.isfile(history_file):
+        return []
+    records = []
+    with open(history_file, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                record = None
+            if not isinstance(record, dict):
+                log.warning(
+                    f"WARNING: Skipping malformed history line {line_number} in '{history_file}'."
+                )
+                continue
+            records.append(record)
+    return records
+
+
+def _percent_change(old: float, new: float) -> float:
+    """Relative change from old to new in percent."""
+    if old == 0:
+        return 0.0 if new == 0 else float("inf")
+    return (new - old) / old * 100.0
+
+
+def _diff_history_records(
+    baseline: Dict[str, Any],
+    candidate: Dict[str, Any],
+    size_threshold: float,
+    time_threshold: float,
+    min_time_delta: float,
+) -> int:
+    """Logs the differences between two runs. Returns the number of regressions."""
+    regressions = 0
+    log.info(
+        f"Baseline:  {baseline.get('timestamp', '?')} (inputs {baseline.get('input_fingerprint', '?')})"
+    )
+    log.info(
+        f"Candidate: {candidate.get('timestamp', '?')} (inputs {candidate.get('input_fingerprint', '?')})"
+    )
+
+    log.info("Outputs:")
+    old_outputs = baseline.get("outputs", {})
+    new_outputs = candidate.get("outputs", {})
+    for path in sorted(set(old_outputs) | set(new_outputs)):
+        old, new = old_outputs.get(path), new_outputs.get(path)
+        if old is None:
+            log.info(f"  + {path}: {_format_size(new.get('size', 0))} (new)")
+            continue
+        if new is None:
+            log.info(f"  - {path}: removed")
+            continue
+        old_size, new_size = old.get("size", 0), new.get("size", 0)
+        change = _percent_change(old_size, new_size)
+        line = f"{path}: {_format_size(old_size)} -> {_format_size(new_size)} ({change:+.1f}%)"
+        if old.get("sha256") != new.get("sha256"):
+            line += ", content changed"
+        if change > size_threshold:
+            regressions += 1
+            log.warning(f"  REGRESSION: {line}")
+        else:
+            log.info(f"  {line}")
+
+    log.info("Stage durations:")
+    old_stages = baseline.get("stages", {})
+    new_stages = candidate.get("stages", {})
+    for stage in sorted(set(old_stages) & set(new_stages)):
+        old, new = old_stages[stage], new_stages[stage]
+        change = _percent_change(old, new)
+        line = f"{stage}: {old:.2f}s -> {new:.2f}s ({change:+.1f}%)"
+        if change > time_threshold and new - old > min_time_delta:
+            regressions += 1
+            log.warning(f"  REGRESSION: {line}")
+        else:
+            log.info(f"  {line}")
+
+    old_counts = baseline.get("file_counts", {})
+    new_counts = candidate.get("file_counts", {})
+    for name in sorted(set(old_counts) | set(new_counts)):
+        if old_counts.get(name) != new_counts.get(name):
+            log.info(
+                f"File count '{name}': {old_counts.get(name, 0)} -> {new_counts.get(name, 0)}"
+            )
+
+    if regressions:
+        log.warning(f"{regressions} regression(s) beyond the configured thresholds.")
+    else:
+        log.info("No regressions beyond the configured thresholds.")
+    return regressions
+
+
+def _show_history_trend(
+    records: List[Dict[str, Any]], limit: int, size_threshold: float
+) -> None:
+    """Logs the recent runs and the size trend of each output file."""
+    recent = records[-limit:]
+    log.info(f"Last {len(recent)} run(s):")
+    for record in recent:
+        total_size = sum(o.get("size", 0) for o in record.get("outputs", {}).values())
+        stages = ", ".join(
+            f"{stage} {seconds:.1f}s"
+            for stage, seconds in record.get("stages", {}).items()
+        )
+        log.info(
+            f"  {record.get('timestamp', '?')}  inputs {record.get('input_fingerprint', '?')}  outputs {_format_size(total_size)}  {stages}"
+        )
+
+    log.info("Output size trend:")
+    for path in sorted(recent[-1].get("outputs", {})):
+        sizes = [
+            r["outputs"][path].get("size", 0)
+            for r in recent
+            if path in r.get("outputs", {})
+        ]
+        change = _percent_change(sizes[0], sizes[-1])
+        line = (
+            f"{path}: {_format_size(sizes[0])} -> {_format_size(sizes[-1])} ({change:+.1f}%), "
+            f"range {_format_size(min(sizes))}..{_format_size(max(sizes))}"
+        )
+        if change > size_threshold:
+            log.warning(f"  GROWTH: {line}")
+        else:
+            log.info(f"  {line}")
+
+
+def _positive_int(value: str) -> int:
+    """argparse type for integers >= 1."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
 
-    # Perform comprehensive pre-checks on mappings *before* orchestration
-    if not _pre_check_all_mappings(
-        asset_mappings=args.asset_mapping,
-        output_mappings=args.output_mapping,
-        target_mod_dir=resolved_paths["target_mod"],
-        unity_project_path=resolved_paths["project"],
+
+def _add_history_command(commands: argparse._SubParsersAction) -> None:
+    """Registers the 'history' command and its 'diff' and 'trend' subcommands."""
+    common = argparse.ArgumentParser(add_help=False)
+    # SUPPRESS keeps a top-level --history-file from being overwritten by a default
+    common.add_argument(
+        "--history-file",
+        default=argparse.SUPPRESS,
+        help=f"Build history file. Relative to the working directory. Defaults to the top-level --history-file ({HISTORY_FILE}).",
+    )
+    common.add_argument(
+        "--size-threshold",
+        type=float,
+        default=HISTORY_SIZE_THRESHOLD_PERCENT,
+        metavar="PCT",
+        help="Flag output files that grew by more than this percentage.",
+    )
+
+    parser = commands.add_parser(
+        "history",
+        help="Inspect the local build history ('diff' or 'trend').",
+        description="Inspects the local AssetBundle build history.",
+    )
+    history_commands = parser.add_subparsers(
+        dest="history_command", metavar="{diff,trend}", required=True
+    )
+
+    diff_parser = history_commands.add_parser(
+        "diff",
+        parents=[common],
+        help="Compare a run against a baseline run and flag regressions.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    diff_parser.add_argument(
+        "--baseline",
+        type=int,
+        default=-2,
+        help="Index of the baseline run in the history (negative counts from the newest).",
+    )
+    diff_parser.add_argument(
+        "--candidate",
+        type=int,
+        default=-1,
+        help="Index of the run to check (negative counts from the newest).",
+    )
+    diff_parser.add_argument(
+        "--time-threshold",
+        type=float,
+        default=HISTORY_TIME_THRESHOLD_PERCENT,
+        metavar="PCT",
+        help="Flag stages that got slower by more than this percentage.",
+    )
+    diff_parser.add_argument(
+        "--min-time-delta",
+        type=float,
+        default=HISTORY_MIN_TIME_DELTA_SECONDS,
+        metavar="SECONDS",
+        help="Ignore stage slowdowns smaller than this.",
+    )
+
+    trend_parser = history_commands.add_parser(
+        "trend",
+        parents=[common],
+        help="Show recent runs and output size trends.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    trend_parser.add_argument(
+        "--limit", type=_positive_int, default=10, help="Number of recent runs to show."
+    )
+
+
+def _history_main(args: argparse.Namespace) -> int:
+    """Runs the 'history' command. Returns the exit code."""
+    history_file = os.path.abspath(args.history_file)
+    records = _load_history(history_file)
+    if not records:
+        log.error(f"ERROR: No build history found in '{history_file}'.")
+        return 1
+
+    if args.history_command == "diff":
+        try:
+            baseline = records[args.baseline]
+            candidate = records[args.candidate]
+        except IndexError:
+            log.error(
+                f"ERROR: Run index out of range; the history has {len(records)} run(s)."
+            )
+            return 1
+        regressions = _diff_history_records(
+            baseline,
+            candidate,
+            args.size_threshold,
+            args.time_threshold,
+            args.min_time_delta,
+        )
+        return 1 if regressions else 0
+
+    _show_history_trend(records, args.limit, args.size_threshold)
+    return 0
+
+
+# =============================================================================
+# Library API
+# =============================================================================
+
+
+class Pipeline:
+    """
+    Reusable build-and-copy pipeline for in-process use (editor plugins, CI drivers).
+    Paths are resolved and mappings pre-checked once on construction;
+    run() may then be called repeatedly and never exits the interpreter.
+    In manual mode without an on_manual_build hook, existing build outputs are used.
+    If history_file is set, each successful run is appended to the build history.
+    """
+
+    def __init__(
+        self,
+        unity_project_path: str,
+        target_mod_dir: str,
+        unity_path: Optional[str] = None,
+        build_method: Optional[str] = None,
+        asset_mappings: Optional[List[str]] = None,
+        output_mappings: Optional[List[str]] = None,
+        staged_deploy: bool = False,
+        callbacks: Optional[PipelineCallbacks] = None,
+        workspace_root: Optional[str] = None,
+        texture_options: Optional[TextureOptions] = None,
+        history_file: Optional[str] = None,
     ):
-        log.critical("Aborting due to failed pre-checks.")
-        sys.exit(1)
+        workspace_root = workspace_root or os.getcwd()
+        config = argparse.Namespace(
+            unity_project_path=unity_project_path,
+            target_mod_dir=target_mod_dir,
+            unity_path=unity_path,
+            build_method=build_method,
+            asset_mapping=list(asset_mappings or []),
+            output_mapping=list(output_mappings or []),
+        )
+
+        resolved_paths = _resolve_paths(config, workspace_root)
+        if not _validate_required_paths(resolved_paths, config, workspace_root):
+            raise PipelineConfigError("invalid configuration or missing required paths")
+        if not _pre_check_all_mappings(
+            asset_mappings=config.asset_mapping,
+            output_mappings=config.output_mapping,
+            target_mod_dir=resolved_paths["target_mod"],
+            unity_project_path=resolved_paths["project"],
+        ):
+            raise PipelineConfigError("failed pre-checks")
+        if texture_options:
+            if texture_options.workers is not None and texture_options.workers < 1:
+                raise PipelineConfigError(
+                    f"invalid texture worker count {texture_options.workers}, must be at least 1"
+                )
+            for budget_dir, budget in texture_options.budgets.items():
+                if budget < 1:
+                    raise PipelineConfigError(
+                        f"invalid texture budget {budget} for '{budget_dir}', must be positive"
+                    )
+
+        self.target_mod_dir: str = resolved_paths["target_mod"]
+        self.unity_project_path: str = resolved_paths["project"]
+        self.unity_path: Optional[str] = resolved_paths.get("unity")
+        self.build_method = build_method
+        self.asset_mappings: List[str] = config.asset_mapping
+        self.output_mappings: List[str] = config.output_mapping
+        self.staged_deploy = staged_deploy
+        self.callbacks = callbacks or PipelineCallbacks()
+        self.texture_options = texture_options
+        self.history_file = history_file
+
+    @classmethod
+    def from_args(
+        cls,
+        args: argparse.Namespace,
+        workspace_root: str,
+        callbacks: Optional[PipelineCallbacks] = None,
+    ) -> "Pipeline":
+        """Creates a pipeline from parsed command-line arguments."""
+        texture_options = None
+        if args.optimize_textures:
+            texture_options = TextureOptions(
+                cache_dir=os.path.join(workspace_root, args.texture_cache_dir),
+                budgets=_parse_texture_budgets(args.texture_budget),
+                workers=args.texture_workers,
+            )
+        return cls(
+            unity_project_path=args.unity_project_path,
+            target_mod_dir=args.target_mod_dir,
+            unity_path=args.unity_path,
+            build_method=args.build_method,
+            asset_mappings=args.asset_mapping,
+            output_mappings=args.output_mapping,
+            staged_deploy=args.staged_deploy,
+            callbacks=callbacks,
+            workspace_root=workspace_root,
+            texture_options=texture_options,
+            history_file=(
+                None
+                if args.no_history
+                else os.path.join(workspace_root, args.history_file)
+            ),
+        )
+
+    def run(self) -> BuildResult:
+        """Runs copy, build and deploy once and returns the result."""
+        stats = {"items": 0, "bytes": 0}
+        stage_durations: Dict[str, float] = {}
+
+        def on_item_copied(mapping_type: str, source_path: str, target_path: str):
+            stats["items"] += 1
+            _emit(
+                self.callbacks, "on_item_copied", mapping_type, source_path, target_path
+            )
+
+        def on_bytes_copied(byte_count: int):
+            stats["bytes"] += byte_count
+            _emit(self.callbacks, "on_bytes_copied", byte_count)
 
-    # Proceed with orchestration only if paths and mappings are valid
-    exit_code = orchestrate_build_and_copy(
-        target_mod_dir=resolved_paths["target_mod"],
-        unity_path=resolved_paths.get("unity"),
-        unity_project_path=resolved_paths["project"],
-        asset_mappings=args.asset_mapping,
-        output_mappings=args.output_mapping,
-        build_method=args.build_method,
+        def on_stage_finished(stage: str, seconds: float):
+            stage_durations[stage] = seconds
+            _emit(self.callbacks, "on_stage_finished", stage, seconds)
+
+        run_callbacks = dataclasses.replace(
+            self.callbacks,
+            on_item_copied=on_item_copied,
+            on_bytes_copied=on_bytes_copied,
+            on_stage_finished=on_stage_finished,
+            on_manual_build=self.callbacks.on_manual_build or _assume_manual_build_done,
+        )
+
+        started = time.perf_counter()
+        exit_code = orchestrate_build_and_copy(
+            target_mod_dir=self.target_mod_dir,
+            unity_path=self.unity_path,
+            unity_project_path=self.unity_project_path,
+            asset_mappings=self.asset_mappings,
+            output_mappings=self.output_mappings,
+            build_method=self.build_method,
+            staged_deploy=self.staged_deploy,
+            callbacks=run_callbacks,
+            texture_options=self.texture_options,
+        )
+        result = BuildResult(
+            exit_code=exit_code,
+            items_copied=stats["items"],
+            bytes_copied=stats["bytes"],
+            duration_seconds=time.perf_counter() - started,
+            stage_durations=stage_durations,
+        )
+
+        # Cancelled manual builds exit cleanly but never reach the output step
+        completed = not self.output_mappings or "outputs" in stage_durations
+        if self.history_file and result.success and completed:
+            try:
+                _append_history_record(
+                    self.history_file, self._create_history_record(result)
+                )
+            except OSError:
+                log.exception(
+                    f"WARNING: Could not update build history '{self.history_file}'."
+                )
+        return result
+
+    def _history_options(self) -> Dict[str, Any]:
+        """Options that change what a run deploys, as stored in the history."""
+        options: Dict[str, Any] = {
+            "staged_deploy": self.staged_deploy,
+            "optimize_textures": self.texture_options is not None,
+        }
+        if self.texture_options:
+            options["png_optimizer_version"] = PNG_OPTIMIZER_VERSION
+            options["texture_budgets"] = self.texture_options.budgets
+        return options
+
+    def _create_history_record(self, result: BuildResult) -> Dict[str, Any]:
+        """
+        Builds the history record of a finished run.
+        Mappings are resolved again so files a staged deploy left untouched are included.
+        """
+        asset_files: Dict[str, str] = {}
+        for mapping in self.asset_mappings:
+            resolved = _resolve_mapping(
+                mapping, self.target_mod_dir, self.unity_project_path, "asset"
+            )
+            for item, final_target in resolved.items:
+                for src_file, _ in _iter_item_files(item, final_target):
+                    rel_path = os.path.relpath(src_file, self.target_mod_dir)
+                    asset_files[rel_path.replace(os.sep, "/")] = src_file
+
+        output_files: Dict[str, Dict[str, Any]] = {}
+        for mapping in self.output_mappings:
+            resolved = _resolve_mapping(
+                mapping, self.unity_project_path, self.target_mod_dir, "output"
+            )
+            for item, final_target in resolved.items:
+                for _, tgt_file in _iter_item_files(item, final_target):
+                    if not os.path.isfile(tgt_file):
+                        continue
+                    rel_path = os.path.relpath(tgt_file, self.target_mod_dir)
+                    output_files[rel_path.replace(os.sep, "/")] = {
+                        "size": os.path.getsize(tgt_file),
+                        "sha256": _hash_file(tgt_file),
+                    }
+
+        mode = (
+            "manual"
+            if self.unity_path is None or self.build_method is None
+            else "automatic"
+        )
+        options = self._history_options()
+        return {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "mode": mode,
+            "options": options,
+            "input_fingerprint": _compute_input_fingerprint(
+                self.build_method,
+                self.asset_mappings,
+                self.output_mappings,
+                asset_files,
+                mode,
+                options,
+            ),
+            "duration": round(result.duration_seconds, 3),
+            # Manual builds are not timed; their build step is human wait time
+            "stages": {
+                stage: round(seconds, 3)
+                for stage, seconds in result.stage_durations.items()
+            },
+            "file_counts": {"assets": len(asset_files), "outputs": len(output_files)},
+            "outputs": output_files,
+        }
+
+    async def run_async(self) -> BuildResult:
+        """Runs the pipeline in a worker thread. Callbacks fire on that thread."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.run)
+
+
+def main():
+    """Main entry point for the script."""
+    # Configure logging to be less verbose by default
+    logging.basicConfig(
+        level=logging.INFO,  # Keep INFO level for key messages
+        format="%(message)s",  # Simplified format
     )
+    args = _parse_arguments()
+    if args.command == "history":
+        sys.exit(_history_main(args))
+
+    workspace_root = os.getcwd()
+
+    # Resolve paths and pre-check mappings *before* orchestration
+    try:
+        pipeline = Pipeline.from_args(
+            args,
+            workspace_root,
+            callbacks=PipelineCallbacks(on_manual_build=_prompt_manual_build),
+        )
+    except PipelineConfigError as e:
+        log.critical(f"Aborting due to {e}.")
+        sys.exit(1)
 
-    sys.exit(exit_code)
+    sys.exit(pipeline.run().exit_code)
 
 
 if __name__ == "__main__":